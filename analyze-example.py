@@ -3,9 +3,8 @@
 
 import argparse
 import csv
-import numpy as np
 import os
-import scipy.stats as stats
+import simulator.modules.analysis as analysis
 import sys
 
 
@@ -51,13 +50,9 @@ for fn in file_names:
 if mode == 'steady-state':
   # Compute steady-state mean average
   averages = [sum(lst) / len(lst) for lst in outer]
-  mean = sum(averages) / len(averages)
-  # Compute standard deviation
-  sd = np.sqrt(sum(map(lambda x: (x-mean)**2, averages)) / (len(averages)-1))
-  # Compute standard error for the mean
-  se = sd / np.sqrt(len(averages))
-  # Compute confidence intervals for the mean
-  ci = se * stats.t.ppf(0.5 + confidence/2, len(averages)-1)
+  # Compute mean, standard deviation, standard error and
+  # confidence intervals for the mean
+  mean, sd, se, ci = analysis.confidence_interval(averages, confidence)
   # Save to a file
   fn = input_dir + '/' + mode + '_{}'.format(warmup)
   with open(fn, 'w', newline='', encoding='utf-8') as f:
@@ -68,16 +63,8 @@ else:
   # Compute means across replications
   zipped = zip(*[lst for lst in outer])
   init_means = list(map(lambda x: sum(x)/len(outer), zipped))
-  means = []
   # Apply Welch's method
-  if window_size == 0:
-    means = init_means
-  else:
-    for i in range(len(init_means) - window_size):
-      if i < window_size:
-        means += [sum([init_means[i+s] for s in range(-i, i+1)]) / (2*(i+1) - 1)]
-      else:
-        means += [sum([init_means[i+s] for s in range(-window_size, window_size+1)]) / (2*window_size + 1)]
+  means = analysis.welch_average(init_means, window_size)
   # Save to a file
   fn = input_dir + '/' + mode + '_{}'.format(window_size)
   with open(fn, 'w', newline='', encoding='utf-8') as f:
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import argparse
+import os
+import simulator.modules.analysis as analysis
+import simulator.modules.dist as dist
+import simulator.modules.mm1 as mm1
+import simulator.modules.models as models
+
+
+### Parse command line arguments
+parser = argparse.ArgumentParser(description="M/M/1 queue simulation -- Distributed script")
+subparsers = parser.add_subparsers(dest='mode', help='coordinator or worker')
+coordinator_parser = subparsers.add_parser('coordinator', help='distribute replications among workers')
+coordinator_parser.add_argument('reps', metavar='repetitions',
+                                type=int, help='number of repetitions')
+coordinator_parser.add_argument('sim_duration', metavar='simulation_duration',
+                                type=int, help='duration of each simulation stage in seconds')
+coordinator_parser.add_argument('int_rate', metavar='interarrival_rate',
+                                type=int, help='mean packet interarrival rate in seconds')
+coordinator_parser.add_argument('sr_rate', metavar='service_rate',
+                                type=int, help='mean packet service rate in seconds')
+coordinator_parser.add_argument('--initial_seed', dest='init_seed', default=0,
+                                type=int, help='base for seed values')
+coordinator_parser.add_argument('--pipeline_depth', dest='pipeline_depth', default=2,
+                                type=int, help='maximum number of outstanding tasks per worker')
+coordinator_parser.add_argument('--analytic', dest='analytic', default='off',
+                                choices=['off', 'validate', 'only'],
+                                help='compare with (validate) or replace simulation by (only) analytic results')
+coordinator_parser.add_argument('--confidence', dest='confidence', default=0.95,
+                                type=float, help='confidence to be used in validation')
+worker_parser = subparsers.add_parser('worker', help='run replications issued by the coordinator')
+for p in (coordinator_parser, worker_parser):
+  p.add_argument('--host', dest='host', default='localhost',
+                 help='host of the coordinator (default: localhost); tasks and results are '
+                      'pickles, so non-loopback hosts require --authkey and a trusted network')
+  p.add_argument('--authkey', dest='authkey', default=os.environ.get('DES_AUTHKEY'),
+                 help='shared secret authenticating coordinator and workers (default: $DES_AUTHKEY)')
+  p.add_argument('--port', dest='port', default=5555,
+                 type=int, help='port of the coordinator (default: 5555)')
+args = parser.parse_args()
+authkey = args.authkey.encode() if args.authkey else None
+
+### Run
+if args.mode == 'coordinator':
+  coordinator = dist.Coordinator(args.host, args.port, args.pipeline_depth, authkey=authkey)
+  params = {'sim_duration': args.sim_duration,
+            'interarrival_rate': args.int_rate,
+            'service_rate': args.sr_rate}
+  seeds = [n + args.init_seed for n in range(args.reps)]
+  estimates = None
+  if args.analytic != 'off':
+    estimates = models.registry.estimate(mm1.run_replication, params)
+    if estimates is None:
+      print("No analytic results for given parameters")
+  # Skip simulation if analytic results are available
+  if args.analytic == 'only' and estimates is not None:
+    coordinator.close()
+    print("mean_delay,{}".format(estimates['mean_delay']))
+  else:
+    try:
+      results = coordinator.run(mm1.run_replication, params, seeds)
+    finally:
+      coordinator.close()
+    # Print mean delay of each replication
+    for n, delays in enumerate(results):
+      print("{},{}".format(n, delays.mean()))
+    # Compare with analytic results
+    if estimates is not None:
+      mean, _, _, ci = analysis.confidence_interval([delays.mean() for delays in results], args.confidence)
+      inside = abs(estimates['mean_delay'] - mean) <= ci
+      print("Simulated mean delay: {} +- {}, analytic: {} ({} the {:.0%} confidence interval)".format(
+          mean, ci, estimates['mean_delay'], "inside" if inside else "OUTSIDE", args.confidence))
+elif args.mode == 'worker':
+  dist.Worker(args.host, args.port, authkey).run()
+else:
+  parser.print_help()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import argparse
+import numpy as np
+import simulator.modules.analysis as analysis
+import simulator.modules.arena as arena
+import simulator.modules.mm1 as mm1
+import simulator.modules.models as models
+
+
+# Default warm-up period, in multiples of the relaxation time
+WARMUP_RELAXATION_TIMES = 5
+
+
+### Parse command line arguments
+parser = argparse.ArgumentParser(description="M/M/1 queue simulation -- Shared memory script")
+parser.add_argument('reps', metavar='repetitions',
+                    type=int, help='number of repetitions')
+parser.add_argument('sim_duration', metavar='simulation_duration',
+                    type=int, help='duration of each simulation stage in seconds')
+parser.add_argument('int_rate', metavar='interarrival_rate',
+                    type=int, help='mean packet interarrival rate in seconds')
+parser.add_argument('sr_rate', metavar='service_rate',
+                    type=int, help='mean packet service rate in seconds')
+parser.add_argument('mode', help='transient or steady-state')
+parser.add_argument('--processes', dest='processes', default=4,
+                    type=int, help='number of worker processes')
+parser.add_argument('--initial_seed', dest='init_seed', default=0,
+                    type=int, help='base for seed values')
+parser.add_argument('--capacity', dest='capacity', default=None,
+                    type=int, help='maximum number of delays stored per repetition (default: twice the expected number)')
+parser.add_argument('--warmup', dest='warmup', default=None,
+                    type=int, help='warm-up period index (steady-state; default: customers arriving '
+                                   'within {} analytic relaxation times, or 0)'.format(WARMUP_RELAXATION_TIMES))
+parser.add_argument('--window_size', dest='window_size', default=0,
+                    type=int, help='window size for Welch\'s method (transient)')
+parser.add_argument('--confidence', dest='confidence', default=0.95,
+                    type=float, help='confidence to be used in confidence interval calculations')
+args = parser.parse_args()
+if args.mode not in ('transient', 'steady-state'):
+  parser.error('Unknown mode specified.')
+capacity = args.capacity or 2 * args.int_rate * args.sim_duration
+params = {'sim_duration': args.sim_duration,
+          'interarrival_rate': args.int_rate,
+          'service_rate': args.sr_rate}
+seeds = [n + args.init_seed for n in range(args.reps)]
+# Seed warm-up period with analytic relaxation time
+warmup = args.warmup
+if warmup is None:
+  estimates = models.registry.estimate(mm1.run_replication, params)
+  warmup = 0
+  if estimates is not None:
+    warmup = int(np.ceil(WARMUP_RELAXATION_TIMES * estimates['relaxation_time'] * args.int_rate))
+
+### Run simulations; delays are written straight into shared memory
+results = arena.ResultArena(args.reps, capacity)
+try:
+  arena.run_replications(results, mm1.run_replication, params, seeds, args.processes)
+  ### Analyze
+  if args.mode == 'steady-state':
+    mean, sd, se, ci = analysis.confidence_interval(results.means(warmup), args.confidence)
+    print("warmup,mean,sd,se,ci")
+    print("{},{},{},{},{}".format(warmup, mean, sd, se, ci))
+  else:
+    for mean in analysis.welch_average(results.transient_means(), args.window_size):
+      print(mean)
+finally:
+  results.close()
+  results.unlink()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import numpy as np
+import scipy.stats as stats
+
+
+def welch_average(means, window_size):
+  """
+  Returns moving averages of the means using Welch's method
+
+  Arguments:
+  means -- Array of means across replications
+  window_size -- Window size
+  """
+  means = np.asarray(means, dtype=np.float64)
+  if window_size == 0:
+    return means
+  indices = np.arange(len(means) - window_size)
+  # Window shrinks at the beginning of the series
+  half = np.minimum(indices, window_size)
+  sums = np.concatenate(([0], np.cumsum(means)))
+  return (sums[indices + half + 1] - sums[indices - half]) / (2*half + 1)
+
+
+def confidence_interval(values, confidence):
+  """
+  Returns (mean, sd, se, ci) of the values, where ci is the half-width
+  of the confidence interval for the mean based on Student's t
+
+  Arguments:
+  values -- Array of values (e.g. per-replication means)
+  confidence -- Confidence level
+  """
+  values = np.asarray(values, dtype=np.float64)
+  mean = values.mean()
+  sd = values.std(ddof=1)
+  se = sd / np.sqrt(len(values))
+  ci = se * stats.t.ppf(0.5 + confidence/2, len(values)-1)
+  return mean, sd, se, ci
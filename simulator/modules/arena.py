@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+from multiprocessing import shared_memory
+import multiprocessing
+import numpy as np
+import warnings
+
+
+class ResultArena:
+  """
+  Shared memory block holding results of replications,
+  indexed by replication id
+  """
+  def __init__(self, replications, capacity, name=None):
+    """
+    Creates new arena, or attaches to an existing one if name is given
+
+    Arguments:
+    replications -- Number of replications
+    capacity -- Maximum number of values stored per replication
+    name -- Name of an existing arena
+    """
+    self.replications = replications
+    self.capacity = capacity
+    # Counts of stored values and true lengths of the results
+    # are followed by the values themselves
+    size = replications * (capacity + 2) * np.dtype(np.float64).itemsize
+    if name is None:
+      self._shm = shared_memory.SharedMemory(create=True, size=size)
+    else:
+      self._shm = shared_memory.SharedMemory(name=name)
+    self.counts = np.ndarray((replications,), dtype=np.int64, buffer=self._shm.buf)
+    self.lengths = np.ndarray((replications,), dtype=np.int64, buffer=self._shm.buf,
+                              offset=self.counts.nbytes)
+    self.data = np.ndarray((replications, capacity), dtype=np.float64, buffer=self._shm.buf,
+                           offset=self.counts.nbytes + self.lengths.nbytes)
+    if name is None:
+      self.counts[:] = 0
+      self.lengths[:] = 0
+
+  @property
+  def name(self):
+    """
+    Returns name of the shared memory block
+    """
+    return self._shm.name
+
+  @property
+  def truncated(self):
+    """
+    Returns array of flags of replications whose values exceeded capacity
+    """
+    return self.lengths > self.counts
+
+  def write(self, replication_id, values):
+    """
+    Stores values of a replication; values beyond capacity are dropped
+    with a warning, and the true length is recorded in lengths
+
+    Arguments:
+    replication_id -- Replication id
+    values -- Array of values
+    """
+    count = min(len(values), self.capacity)
+    self.data[replication_id, :count] = values[:count]
+    self.counts[replication_id] = count
+    self.lengths[replication_id] = len(values)
+    if count < len(values):
+      warnings.warn("Replication {} truncated from {} to {} values".format(
+          replication_id, len(values), count))
+
+  def replication(self, replication_id):
+    """
+    Returns view of the values stored by a replication
+
+    Arguments:
+    replication_id -- Replication id
+    """
+    return self.data[replication_id, :self.counts[replication_id]]
+
+  def means(self, warmup=0):
+    """
+    Returns array of per-replication means; raises ValueError if
+    any replication was truncated, as its mean would be biased,
+    or if warmup leaves a replication without values
+
+    Arguments:
+    warmup -- Number of initial values excluded from each replication
+    """
+    if self.truncated.any():
+      raise ValueError("Replications {} exceeded capacity {}".format(
+          np.flatnonzero(self.truncated).tolist(), self.capacity))
+    if (self.counts <= warmup).any():
+      raise ValueError("Replications {} have no values after warm-up {}".format(
+          np.flatnonzero(self.counts <= warmup).tolist(), warmup))
+    return np.array([self.data[i, warmup:self.counts[i]].mean() for i in range(self.replications)])
+
+  def transient_means(self):
+    """
+    Returns array of means across replications for each index
+    stored by all replications (truncation does not affect these)
+    """
+    return self.data[:, :self.counts.min()].mean(axis=0)
+
+  def close(self):
+    """
+    Closes access to the arena; views obtained from it become invalid
+    """
+    self.counts = None
+    self.lengths = None
+    self.data = None
+    self._shm.close()
+
+  def unlink(self):
+    """
+    Destroys the shared memory block (call once, from the creator)
+    """
+    self._shm.unlink()
+
+
+# Arena of the current worker process
+_worker_arena = None
+
+def _attach(name, replications, capacity):
+  """
+  Attaches worker process to the arena
+
+  Arguments:
+  name -- Name of the arena
+  replications -- Number of replications
+  capacity -- Maximum number of values stored per replication
+  """
+  global _worker_arena
+  _worker_arena = ResultArena(replications, capacity, name)
+
+def _run(task):
+  """
+  Runs single replication and stores its result in the arena
+
+  Arguments:
+  task -- Tuple (replication id, factory, params, seed)
+  """
+  replication_id, factory, params, seed = task
+  _worker_arena.write(replication_id, factory(seed, **params))
+
+
+def run_replications(arena, factory, params, seeds, processes=None):
+  """
+  Runs one replication per seed in a pool of worker processes;
+  replication n stores the array returned by factory(seeds[n], **params)
+  in the arena, so results are not sent back to the parent
+
+  Arguments:
+  arena -- ResultArena with at least len(seeds) replications
+  factory -- Function running a single replication
+  params -- Dictionary of model parameters
+  seeds -- List of seeds, one per replication
+  processes -- Number of worker processes (default: number of CPUs)
+  """
+  initargs = (arena.name, arena.replications, arena.capacity)
+  with multiprocessing.Pool(processes, initializer=_attach, initargs=initargs) as pool:
+    pool.map(_run, [(n, factory, params, seed) for n, seed in enumerate(seeds)])
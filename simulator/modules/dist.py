@@ -0,0 +1,411 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import collections
+import hashlib
+import hmac
+import ipaddress
+import os
+import pickle
+import selectors
+import socket
+import struct
+import time
+import traceback
+
+
+# Format of the message length header
+HEADER_FORMAT = "!I"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+# Size of the authentication challenge
+CHALLENGE_SIZE = 32
+# Size of the authentication response
+DIGEST_SIZE = hashlib.sha256().digest_size
+# Seconds allowed for blocking socket operations
+SOCKET_TIMEOUT = 5
+# Maximum number of bytes read from a worker at once
+RECEIVE_SIZE = 65536
+
+
+def send_message(sock, obj):
+  """
+  Sends pickled object prefixed with its length
+
+  Arguments:
+  sock -- Connected socket
+  obj -- Object to be sent
+  """
+  data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+  sock.sendall(struct.pack(HEADER_FORMAT, len(data)) + data)
+
+
+def receive_message(sock):
+  """
+  Receives and unpickles object sent with send_message
+
+  Arguments:
+  sock -- Connected socket
+  """
+  length, = struct.unpack(HEADER_FORMAT, _receive_exactly(sock, HEADER_SIZE))
+  return pickle.loads(_receive_exactly(sock, length))
+
+
+def authenticate(sock, authkey):
+  """
+  Performs mutual challenge-response authentication with the peer
+  using HMAC of the shared authkey; raises AuthenticationError
+  if the peer does not know the key
+
+  Arguments:
+  sock -- Connected socket
+  authkey -- Shared secret key (bytes)
+  """
+  challenge = os.urandom(CHALLENGE_SIZE)
+  sock.sendall(challenge)
+  peer_challenge = _receive_exactly(sock, CHALLENGE_SIZE)
+  sock.sendall(hmac.new(authkey, peer_challenge, 'sha256').digest())
+  response = _receive_exactly(sock, DIGEST_SIZE)
+  if not hmac.compare_digest(response, hmac.new(authkey, challenge, 'sha256').digest()):
+    raise AuthenticationError("Peer failed to authenticate")
+
+
+def _receive_exactly(sock, size):
+  """
+  Receives exactly size bytes; raises ConnectionError if
+  the connection is closed before that
+
+  Arguments:
+  sock -- Connected socket
+  size -- Number of bytes to receive
+  """
+  chunks = []
+  while size > 0:
+    chunk = sock.recv(size)
+    if not chunk:
+      raise ConnectionError("Connection closed by peer")
+    chunks += [chunk]
+    size -= len(chunk)
+  return b"".join(chunks)
+
+
+class AuthenticationError(Exception):
+  """
+  Raised when the peer fails to authenticate
+  """
+  pass
+
+
+class TaskError(Exception):
+  """
+  Raised by Coordinator when a task cannot be completed
+  """
+  pass
+
+
+class _Peer:
+  """
+  State of a connection to a worker
+  """
+  def __init__(self, conn, challenge=None):
+    """
+    Constructs _Peer instance
+
+    Arguments:
+    conn -- Connection to the worker
+    challenge -- Authentication challenge sent to the worker, if any
+    """
+    self.conn = conn
+    self.challenge = challenge
+    # Worker is authenticated if no challenge was sent
+    self.authenticated = challenge is None
+    self.responded = False
+    # Received bytes not yet forming a complete message
+    self.buffer = bytearray()
+    # Tasks issued to the worker
+    self.tasks = {}
+    self.last_activity = time.monotonic()
+
+
+class Coordinator:
+  """
+  Distributes replications among workers connected over TCP
+
+  Messages are pickles, so anyone able to connect to the coordinator
+  (or to act as one for a worker) can run arbitrary code on the other
+  side. Without authkey the coordinator only listens on loopback, which
+  still admits every local user; with authkey both sides authenticate
+  each other before exchanging any pickle. Only use authkey over trusted
+  networks, as the traffic itself is not encrypted.
+  """
+  def __init__(self, host="localhost", port=0, pipeline_depth=2, max_reissues=3, timeout=None,
+               authkey=None):
+    """
+    Constructs Coordinator instance and starts listening for workers
+
+    Arguments:
+    host -- Host to listen on (must be loopback unless authkey is given)
+    authkey -- Shared secret key (bytes) required from workers
+    port -- Port to listen on (0 picks a free port)
+    pipeline_depth -- Maximum number of outstanding tasks per worker
+    max_reissues -- Maximum number of times a task is reissued after worker failures
+    timeout -- Seconds to wait for any worker activity, and for a worker to
+               complete a partially sent message or handshake (default: forever)
+    """
+    self.pipeline_depth = pipeline_depth
+    self.max_reissues = max_reissues
+    self.timeout = timeout
+    self._authkey = authkey
+    # Refuse to expose unauthenticated pickles beyond loopback
+    if authkey is None and not ipaddress.ip_address(socket.gethostbyname(host)).is_loopback:
+      raise ValueError("authkey is required to listen on non-loopback host {}".format(host))
+    # Create listening socket
+    self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    self._server.bind((host, port))
+    self._server.listen()
+
+  @property
+  def address(self):
+    """
+    Returns (host, port) the coordinator listens on
+    """
+    return self._server.getsockname()
+
+  def run(self, factory, params, seeds):
+    """
+    Runs one replication per seed and returns list of results
+    in the order of seeds
+
+    The factory is called by the workers as factory(seed, **params);
+    it has to be importable by the workers (module-level function).
+    TaskError is raised if the factory raises, if a task is reissued
+    more than max_reissues times, or if no worker activity occurs
+    within timeout.
+
+    Arguments:
+    factory -- Function running a single replication
+    params -- Dictionary of model parameters
+    seeds -- List of seeds, one per replication
+    """
+    # Queue of (task id, seed) pairs waiting to be issued
+    pending = collections.deque(enumerate(seeds))
+    # Connected workers
+    peers = {}
+    # Number of reissues of each task
+    reissues = collections.Counter()
+    results = {}
+    selector = selectors.DefaultSelector()
+    selector.register(self._server, selectors.EVENT_READ)
+    try:
+      while len(results) < len(seeds):
+        events = selector.select(self.timeout)
+        for key, _ in events:
+          if key.fileobj is self._server:
+            self._accept(peers, selector)
+          else:
+            peer = peers[key.fileobj]
+            try:
+              messages = self._receive(peer)
+              for task_id, success, result in messages:
+                # Failed tasks are not reissued; the result is the traceback
+                if not success:
+                  raise TaskError("Task {} failed:\n{}".format(task_id, result))
+                del peer.tasks[task_id]
+                results[task_id] = result
+            except TaskError:
+              raise
+            except Exception:
+              # Closed connection, failed authentication or malformed message
+              self._reissue(peer, peers, pending, selector, reissues)
+        # Drop workers stalled in the middle of a message or handshake
+        stalled = self._drop_stalled(peers, pending, selector, reissues)
+        if not events and not stalled:
+          raise TaskError("No worker activity within {} s".format(self.timeout))
+        # Keep each worker's pipeline full
+        for peer in list(peers.values()):
+          while peer.authenticated and pending and len(peer.tasks) < self.pipeline_depth:
+            task_id, seed = pending.popleft()
+            peer.tasks[task_id] = seed
+            try:
+              send_message(peer.conn, (task_id, factory, params, seed))
+            except OSError:
+              self._reissue(peer, peers, pending, selector, reissues)
+              break
+    finally:
+      # Shut down the workers
+      for peer in peers.values():
+        if peer.authenticated:
+          try:
+            send_message(peer.conn, None)
+          except OSError:
+            pass
+        peer.conn.close()
+      selector.close()
+    return [results[task_id] for task_id in range(len(seeds))]
+
+  def close(self):
+    """
+    Stops listening for workers
+    """
+    self._server.close()
+
+  def _accept(self, peers, selector):
+    """
+    Accepts new worker and sends it the authentication challenge
+    if authkey is set
+
+    Arguments:
+    peers -- Dictionary of connected workers
+    selector -- Selector monitoring the connections
+    """
+    conn, _ = self._server.accept()
+    # Bound blocking sends; receives only read what is available
+    conn.settimeout(SOCKET_TIMEOUT)
+    challenge = None
+    if self._authkey is not None:
+      challenge = os.urandom(CHALLENGE_SIZE)
+      try:
+        conn.sendall(challenge)
+      except OSError:
+        conn.close()
+        return
+    peers[conn] = _Peer(conn, challenge)
+    selector.register(conn, selectors.EVENT_READ)
+
+  def _receive(self, peer):
+    """
+    Reads available bytes from the worker and returns list of
+    complete messages; raises on closed connection, failed
+    authentication or malformed message
+
+    Arguments:
+    peer -- Worker state
+    """
+    data = peer.conn.recv(RECEIVE_SIZE)
+    if not data:
+      raise ConnectionError("Connection closed by peer")
+    peer.buffer += data
+    peer.last_activity = time.monotonic()
+    if not peer.authenticated:
+      self._authenticate(peer)
+    messages = []
+    while peer.authenticated and len(peer.buffer) >= HEADER_SIZE:
+      length, = struct.unpack_from(HEADER_FORMAT, peer.buffer)
+      if len(peer.buffer) < HEADER_SIZE + length:
+        break
+      message = pickle.loads(bytes(peer.buffer[HEADER_SIZE:HEADER_SIZE + length]))
+      del peer.buffer[:HEADER_SIZE + length]
+      task_id, success, result = message
+      if task_id not in peer.tasks:
+        raise ValueError("Unexpected task id {}".format(task_id))
+      messages += [(task_id, success, result)]
+    return messages
+
+  def _authenticate(self, peer):
+    """
+    Advances the authentication handshake with the received bytes:
+    answers the worker's challenge and checks its response
+
+    Arguments:
+    peer -- Worker state
+    """
+    if not peer.responded and len(peer.buffer) >= CHALLENGE_SIZE:
+      peer_challenge = bytes(peer.buffer[:CHALLENGE_SIZE])
+      peer.conn.sendall(hmac.new(self._authkey, peer_challenge, 'sha256').digest())
+      peer.responded = True
+    if len(peer.buffer) >= CHALLENGE_SIZE + DIGEST_SIZE:
+      response = bytes(peer.buffer[CHALLENGE_SIZE:CHALLENGE_SIZE + DIGEST_SIZE])
+      expected = hmac.new(self._authkey, peer.challenge, 'sha256').digest()
+      if not hmac.compare_digest(response, expected):
+        raise AuthenticationError("Worker failed to authenticate")
+      del peer.buffer[:CHALLENGE_SIZE + DIGEST_SIZE]
+      peer.authenticated = True
+
+  def _drop_stalled(self, peers, pending, selector, reissues):
+    """
+    Drops workers that left a message or handshake incomplete for
+    longer than timeout; returns True if any worker was dropped
+
+    Arguments:
+    peers -- Dictionary of connected workers
+    pending -- Queue of tasks waiting to be issued
+    selector -- Selector monitoring the connections
+    reissues -- Counter of reissues of each task
+    """
+    if self.timeout is None:
+      return False
+    deadline = time.monotonic() - self.timeout
+    stalled = [peer for peer in peers.values()
+               if (peer.buffer or not peer.authenticated) and peer.last_activity < deadline]
+    for peer in stalled:
+      self._reissue(peer, peers, pending, selector, reissues)
+    return len(stalled) > 0
+
+  def _reissue(self, peer, peers, pending, selector, reissues):
+    """
+    Drops failed worker and puts its outstanding tasks back
+    in the front of the pending queue; raises TaskError if a task
+    exceeds max_reissues
+
+    Arguments:
+    peer -- State of the failed worker
+    peers -- Dictionary of connected workers
+    pending -- Queue of tasks waiting to be issued
+    selector -- Selector monitoring the connections
+    reissues -- Counter of reissues of each task
+    """
+    del peers[peer.conn]
+    selector.unregister(peer.conn)
+    peer.conn.close()
+    for task_id in peer.tasks:
+      reissues[task_id] += 1
+      if reissues[task_id] > self.max_reissues:
+        raise TaskError("Task {} reissued more than {} times".format(task_id, self.max_reissues))
+    pending.extendleft(sorted(peer.tasks.items(), reverse=True))
+    peer.tasks = {}
+
+
+class Worker:
+  """
+  Runs replications issued by a Coordinator
+  """
+  def __init__(self, host, port, authkey=None):
+    """
+    Constructs Worker instance
+
+    Arguments:
+    host -- Host of the coordinator
+    port -- Port of the coordinator
+    authkey -- Shared secret key (bytes) of the coordinator
+    """
+    self.host = host
+    self.port = port
+    self._authkey = authkey
+
+  def run(self):
+    """
+    Connects to the coordinator and runs tasks until told to stop
+    """
+    with socket.create_connection((self.host, self.port)) as sock:
+      if self._authkey is not None:
+        sock.settimeout(SOCKET_TIMEOUT)
+        authenticate(sock, self._authkey)
+        sock.settimeout(None)
+      while True:
+        try:
+          task = receive_message(sock)
+        except ConnectionError:
+          break
+        # None signals end of work
+        if task is None:
+          break
+        task_id, factory, params, seed = task
+        # Report failures of the factory instead of dropping the connection
+        try:
+          message = (task_id, True, factory(seed, **params))
+        except Exception:
+          message = (task_id, False, traceback.format_exc())
+        try:
+          send_message(sock, message)
+        except (ConnectionError, OSError):
+          break
@@ -1,9 +1,13 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
+import collections
 import csv
+import numpy as np
 import os.path
+import simulator.modules.models as models
 import simulator.modules.sim as sim
+import simulator.modules.splitting as splitting
 import unittest
 
 
@@ -14,6 +18,8 @@ class MM1EventHandler(sim.EventHandler):
   # IDs of the handled events
   ARRIVAL_EVENT = "Arrival"
   DEPARTURE_EVENT = "Departure"
+  # Maximum number of snapshots kept in the ring buffer
+  SNAPSHOT_BUFFER_SIZE = 1024
   
   def __init__(self, simulation_engine):
     """
@@ -32,36 +38,142 @@ class MM1EventHandler(sim.EventHandler):
     self._arrivals = []
     # Initialize list of departure times
     self._departures = []
+    # Initialize record arrival and departure times flag; without
+    # them, only the time-weighted statistics are kept (no delays)
+    self.record_delays = True
+    # Initialize save delays to a file flag
+    self.save_delays = True
+    # Initialize delay threshold for counting exceedances (None disables)
+    self.delay_threshold = None
+    # Initialize number of delays exceeding the threshold
+    self._delay_exceedances = 0
+    # Initialize snapshot interval (0 disables snapshots)
+    self.snapshot_interval = 0
+    # Initialize time of the start of the simulation
+    self._start_time = 0
+    # Initialize time of the last state change
+    self._last_event_time = 0
+    # Initialize area under the queue length curve
+    self._queue_length_area = 0
+    # Initialize total busy time of the server
+    self._busy_time = 0
+    # Initialize maximum observed queue length
+    self._max_queue_length = 0
+    # Initialize time of the next snapshot
+    self._next_snapshot_time = 0
+    # Initialize ring buffer of snapshots
+    self._snapshots = collections.deque(maxlen=MM1EventHandler.SNAPSHOT_BUFFER_SIZE)
+  
+  @property
+  def queue_length(self):
+    """
+    Returns current queue length (including customer in service)
+    """
+    return self._queue_length
+  
+  @property
+  def last_delay(self):
+    """
+    Returns delay of the last departed customer, or None
+    """
+    if len(self._departures) == 0:
+      return None
+    return self._departures[-1] - self._arrivals[len(self._departures) - 1]
+  
+  @property
+  def delay_exceedances(self):
+    """
+    Returns number of delays exceeding delay_threshold
+    """
+    return self._delay_exceedances
+  
+  @property
+  def delays(self):
+    """
+    Returns array of delays of the customers that have departed
+    """
+    length = min(len(self._arrivals), len(self._departures))
+    return np.array(self._departures[:length]) - np.array(self._arrivals[:length])
+  
+  @property
+  def mean_queue_length(self):
+    """
+    Returns time-average queue length (including customer in service)
+    """
+    elapsed = self._last_event_time - self._start_time
+    return self._queue_length_area / elapsed if elapsed > 0 else 0
+  
+  @property
+  def utilisation(self):
+    """
+    Returns fraction of time the server was busy
+    """
+    elapsed = self._last_event_time - self._start_time
+    return self._busy_time / elapsed if elapsed > 0 else 0
+  
+  @property
+  def max_queue_length(self):
+    """
+    Returns maximum observed queue length
+    """
+    return self._max_queue_length
+  
+  @property
+  def snapshots(self):
+    """
+    Returns list of the most recent snapshots; each snapshot is a tuple
+    (time, queue length, queue length area, busy time)
+    """
+    return list(self._snapshots)
+  
+  def clone_replacements(self):
+    """
+    Overriden method; clones only keep arrival times of the customers
+    still in the system, so their delays cover departures after cloning
+    """
+    return [('_arrivals', self._arrivals[len(self._departures):]), ('_departures', [])]
   
   def handle_start(self):
     """
     Overriden method
     """
+    # Reset time-weighted statistics
+    self._start_time = self._simulation_engine.simulation_time
+    self._last_event_time = self._start_time
+    self._next_snapshot_time = self._start_time + self.snapshot_interval
     self._schedule_arrival_event(self._simulation_engine.simulation_time)
   
   def handle_stop(self):
     """
     Overriden method
     """
-    self._save_statistics()
+    if self.save_delays and self.record_delays:
+      self._save_statistics()
   
   def handle_event(self, event):
     """
     Overriden method
     """
+    # Accumulate time-weighted statistics up to the event's time
+    self._update_time_averages(event.time)
     # Check event's identifier
     if event.identifier == MM1EventHandler.ARRIVAL_EVENT:
       # Increment the queue length
       self._queue_length += 1
       # Record event's arrival time (stats)
-      self._arrivals += [event.time]
+      if self.record_delays:
+        self._arrivals += [event.time]
       # Schedule next arrival event
       self._schedule_arrival_event(event.time)
     if event.identifier == MM1EventHandler.DEPARTURE_EVENT:
       # Decrement the queue length
       self._queue_length -= 1
       # Record event's departure time (stats)
-      self._departures += [event.time]
+      if self.record_delays:
+        self._departures += [event.time]
+        # Count delays exceeding the threshold
+        if self.delay_threshold is not None and self.last_delay > self.delay_threshold:
+          self._delay_exceedances += 1
       # Set is processing flag to False
       self._is_processing = False
     # Service customer if free and queue is not empty
@@ -70,6 +182,38 @@ class MM1EventHandler(sim.EventHandler):
       self._schedule_departure_event(event.time)
       # Set is processing flag to True
       self._is_processing = True
+    # Record maximum queue length
+    self._max_queue_length = max(self._max_queue_length, self._queue_length)
+  
+  def _update_time_averages(self, time):
+    """
+    Accumulates time-weighted statistics for the period since
+    the last state change, taking any snapshots that fall within
+
+    Keyword arguments:
+    time -- Current simulation time
+    """
+    # Take snapshots; the state is constant until the current event
+    if self.snapshot_interval > 0:
+      while self._next_snapshot_time <= time:
+        self._advance_time_averages(self._next_snapshot_time)
+        self._snapshots.append((self._next_snapshot_time, self._queue_length,
+                                self._queue_length_area, self._busy_time))
+        self._next_snapshot_time += self.snapshot_interval
+    self._advance_time_averages(time)
+
+  def _advance_time_averages(self, time):
+    """
+    Adds the contribution of the current state up to the given time
+
+    Keyword arguments:
+    time -- Simulation time to advance to
+    """
+    delta_time = time - self._last_event_time
+    self._queue_length_area += self._queue_length * delta_time
+    if self._is_processing:
+      self._busy_time += delta_time
+    self._last_event_time = time
   
   def _generate_arrival_event(self, base_time):
     """
@@ -143,3 +287,115 @@ class MM1EventHandler(sim.EventHandler):
         for d in delays:
           writer.writerow([d])
   
+
+
+def run_replication(seed, sim_duration, interarrival_rate, service_rate):
+  """
+  Runs single M/M/1 replication and returns array of delays
+
+  Arguments:
+  seed -- Seed for the PRNG
+  sim_duration -- Simulation duration
+  interarrival_rate -- Mean packet interarrival rate
+  service_rate -- Mean packet service rate
+  """
+  # Create new simulation engine
+  se = sim.SimulationEngine()
+  # Seed NumPy PRNG
+  se.prng = np.random.RandomState(seed)
+  # Create MM1 specific event handler
+  event_handler = MM1EventHandler(se)
+  se.event_handler = event_handler
+  # Set simulation parameters
+  event_handler.interarrival_rate = interarrival_rate
+  event_handler.service_rate = service_rate
+  event_handler.save_delays = False
+  # Simulate
+  se.stop(sim_duration)
+  se.start()
+  return event_handler.delays
+
+
+def analytic_estimates(interarrival_rate, service_rate):
+  """
+  Returns dictionary of steady-state M/M/1 results, or None
+  if the queue is unstable
+
+  Arguments:
+  interarrival_rate -- Mean packet interarrival rate
+  service_rate -- Mean packet service rate
+  """
+  rho = interarrival_rate / service_rate
+  if rho >= 1:
+    return None
+  return {'mean_delay': 1 / (service_rate - interarrival_rate),
+          'mean_queue_length': rho / (1 - rho),
+          'utilisation': rho,
+          # Time scale of convergence to steady state
+          'relaxation_time': 1 / (service_rate * (1 - rho**0.5)**2)}
+
+
+def delay_tail_probability(delay, interarrival_rate, service_rate):
+  """
+  Returns steady-state probability that the delay exceeds given value
+
+  Arguments:
+  delay -- Delay value
+  interarrival_rate -- Mean packet interarrival rate
+  service_rate -- Mean packet service rate
+  """
+  return np.exp(-(service_rate - interarrival_rate) * delay)
+
+
+def delay_exceeds(sla):
+  """
+  Returns splitting target checking whether the delay of the last
+  departed customer exceeds sla
+
+  Arguments:
+  sla -- Delay bound
+  """
+  def target(engine):
+    delay = engine.event_handler.last_delay
+    return delay is not None and delay > sla
+  return target
+
+
+def delay_tail_splitting(sla, interarrival_rate, service_rate, thresholds, effort, seed):
+  """
+  Returns splitting estimate of the steady-state probability that
+  the delay exceeds sla
+
+  By regeneration, the probability equals the expected number of
+  exceedances in a busy cycle divided by the expected number of
+  customers in a busy cycle, 1 / (1 - rho). The numerator is estimated
+  by splitting on the queue length.
+
+  Arguments:
+  sla -- Delay bound
+  interarrival_rate -- Mean packet interarrival rate
+  service_rate -- Mean packet service rate
+  thresholds -- Increasing list of queue length thresholds
+  effort -- Number of trajectories simulated in each stage
+  seed -- Seed for the PRNGs
+  """
+  se = sim.SimulationEngine()
+  se.prng = np.random.RandomState(seed)
+  event_handler = MM1EventHandler(se)
+  se.event_handler = event_handler
+  event_handler.interarrival_rate = interarrival_rate
+  event_handler.service_rate = service_rate
+  event_handler.save_delays = False
+  event_handler.delay_threshold = sla
+  # Pause at the start of the first busy cycle
+  se.stop(float('inf'))
+  se.start(lambda: True)
+  queue_length = lambda engine: engine.event_handler.queue_length
+  cycle_ended = lambda engine: engine.event_handler.queue_length == 0 and engine.simulation_time > 0
+  estimator = splitting.FixedEffortSplitting(queue_length, thresholds, effort, cycle_ended)
+  exceedances = estimator.expected_count(se, seed, lambda engine: engine.event_handler.delay_exceedances)
+  return exceedances * (1 - interarrival_rate / service_rate)
+
+
+# Register analytic results of the model
+models.registry.register(run_replication, analytic_estimates)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import functools
+import inspect
+
+
+class ModelRegistry:
+  """
+  Maps replication factories to analytic (or surrogate) estimators
+  """
+  def __init__(self, cache_size=128):
+    """
+    Constructs ModelRegistry instance
+
+    Arguments:
+    cache_size -- Maximum number of memoized estimates
+    """
+    # Initialize dictionary of estimators
+    self._estimators = {}
+    # Memoize estimates per factory and parameter set
+    self._cached_estimate = functools.lru_cache(maxsize=cache_size)(self._estimate)
+
+  def register(self, factory, estimator):
+    """
+    Registers estimator for the model run by factory
+
+    The estimator declares the factory parameters it uses as its
+    arguments; it is called with those only (or with all of them if it
+    takes **kwargs), so estimates are memoized per relevant parameter
+    set. It returns a dictionary of estimates, or None if no closed
+    form exists for the given parameters.
+
+    Arguments:
+    factory -- Function running a single replication
+    estimator -- Function returning dictionary of estimates
+    """
+    self._estimators[factory] = estimator
+    self._cached_estimate.cache_clear()
+
+  def has_estimator(self, factory):
+    """
+    Returns True if an estimator is registered for the factory
+
+    Arguments:
+    factory -- Function running a single replication
+    """
+    return factory in self._estimators
+
+  def estimate(self, factory, params):
+    """
+    Returns (memoized) dictionary of estimates for the parameters,
+    or None if not available
+
+    Arguments:
+    factory -- Function running a single replication
+    params -- Dictionary of model parameters
+    """
+    estimator = self._estimators.get(factory, None)
+    if estimator is None:
+      return None
+    items = tuple(sorted(self._used_parameters(estimator, params).items()))
+    estimates = self._cached_estimate(factory, items)
+    return dict(estimates) if estimates is not None else None
+
+  def cache_info(self):
+    """
+    Returns statistics of the estimate cache
+    """
+    return self._cached_estimate.cache_info()
+
+  def _used_parameters(self, estimator, params):
+    """
+    Returns dictionary of the parameters accepted by the estimator
+
+    Arguments:
+    estimator -- Function returning dictionary of estimates
+    params -- Dictionary of model parameters
+    """
+    signature = inspect.signature(estimator).parameters.values()
+    if any(p.kind == inspect.Parameter.VAR_KEYWORD for p in signature):
+      return params
+    names = {p.name for p in signature}
+    return {name: value for name, value in params.items() if name in names}
+
+  def _estimate(self, factory, items):
+    """
+    Calls the estimator registered for the factory
+
+    Arguments:
+    factory -- Function running a single replication
+    items -- Sorted tuple of (name, value) parameter pairs
+    """
+    estimator = self._estimators.get(factory, None)
+    if estimator is None:
+      return None
+    return estimator(**dict(items))
+
+
+# Default registry
+registry = ModelRegistry()
@@ -2,6 +2,7 @@
 # encoding: utf-8
 
 from abc import abstractmethod, ABCMeta
+import copy
 import datetime
 import random
 import time
@@ -133,6 +134,8 @@ class EventHandler(metaclass=ABCMeta):
     self._simulation_engine.register_callback(self.handle_stop, SimulationEngine.STOP_CALLBACK)
     # imminent event
     self._simulation_engine.register_callback(self.handle_event, SimulationEngine.EVENT_CALLBACK)
+    # batch of imminent events
+    self._simulation_engine.register_callback(self.handle_events, SimulationEngine.BATCH_CALLBACK)
   
   @abstractmethod
   def handle_start(self):
@@ -158,6 +161,27 @@ class EventHandler(metaclass=ABCMeta):
     """
     pass
   
+  def clone_replacements(self):
+    """
+    Returns list of (attribute, value) pairs; clones made by
+    SimulationEngine.clone get (copies of) these values instead of
+    copies of the attributes. Override to avoid copying data that
+    grows with the run, e.g. per-customer history. By default,
+    everything is copied.
+    """
+    return []
+  
+  def handle_events(self, batch):
+    """
+    Handles batch of imminent events (see SimulationEngine.batch_window);
+    by default, calls handle_event for each event in the batch order
+    
+    Arguments:
+    batch -- List of events to be handled
+    """
+    for event in batch:
+      self.handle_event(event)
+  
 
 class SimulationEngine:
   """
@@ -169,6 +193,7 @@ class SimulationEngine:
   START_CALLBACK = "start"
   STOP_CALLBACK = "stop"
   EVENT_CALLBACK = "event"
+  BATCH_CALLBACK = "batch"
   
   def __init__(self):
     """
@@ -183,15 +208,31 @@ class SimulationEngine:
     # Flag representing finishing event
     self._finish_event_exists = False
     # Initialize callback dictionary
-    self._callback_dict = {self.START_CALLBACK: [], self.STOP_CALLBACK: [], self.EVENT_CALLBACK: []}
+    self._callback_dict = {self.START_CALLBACK: [], self.STOP_CALLBACK: [],
+                           self.EVENT_CALLBACK: [], self.BATCH_CALLBACK: []}
+    # Initialize batch window; if None, events are handled one at a time,
+    # otherwise all events occurring within batch_window of the imminent
+    # event are handled as a batch at the time of the imminent event.
+    # Events scheduled while a batch is handled that would occur before
+    # the last event of the batch are delayed to its time, so handlers
+    # never see time going backwards (a window > 0 thus approximates the
+    # model). Events (and batches) with equal times are handled in the
+    # order in which they were scheduled.
+    self.batch_window = None
+    # Initialize time of the latest event passed to the event handlers
+    self._handled_time = 0
     # Initialize default PRNG
     self.prng = PRNG()
     # Initialize event handler
     self.event_handler = None
 
-  def start(self):
+  def start(self, condition=None):
     """
-    Starts simulation
+    Starts simulation; returns True if paused by the condition
+
+    Arguments:
+    condition -- Optional function; simulation is paused before
+                 the next event as soon as it returns True
     """
     # Check whether an EventHandler is attached; if not, throw an error
     if not self.event_handler:
@@ -199,16 +240,66 @@ class SimulationEngine:
     # Notify of the start of simulation; event handlers should
     # generate first event
     self._notify_start()
+    return self.resume(condition)
+  
+  def resume(self, condition=None):
+    """
+    Resumes (paused) simulation; returns True if paused by the condition
+
+    Arguments:
+    condition -- Optional function; simulation is paused before
+                 the next event as soon as it returns True
+    """
     # Traverse the event list
     while len(self._event_list) > 0:
-      # Remove the imminent event from the event list
-      imminent = self._event_list.pop()
-      # Advance clock to the imminent event
-      self.simulation_time = imminent.time
-      # Notify of the current event
-      self._notify_event(imminent)
+      # Pause if the condition is met
+      if condition is not None and condition():
+        return True
+      if self.batch_window is None:
+        # Remove the imminent event from the event list
+        imminent = self._event_list.pop()
+        # Advance clock to the imminent event
+        self.simulation_time = imminent.time
+        self._handled_time = imminent.time
+        # Notify of the current event
+        self._notify_event(imminent)
+      else:
+        # Remove the imminent batch from the event list
+        batch = self._pop_batch()
+        # Advance clock to the imminent event of the batch
+        self.simulation_time = batch[0].time
+        self._handled_time = batch[-1].time
+        # Notify of the current batch
+        self._notify_batch(batch)
     # Notify of the end of the simulation
     self._notify_stop()
+    return False
+  
+  def clone(self, stop_callbacks=True):
+    """
+    Returns deep copy of this engine, including the event list
+    and the attached event handler(s) and PRNG; attributes of the
+    attached event handler are replaced as given by its
+    clone_replacements
+    
+    Arguments:
+    stop_callbacks -- If False, the clone does not notify of the stop
+                      of the simulation (e.g. to avoid saving statistics)
+    """
+    handler = self.event_handler
+    replacements = handler.clone_replacements() if handler is not None else []
+    # Temporarily swap out the replaced attributes while copying
+    originals = [(name, getattr(handler, name)) for name, _ in replacements]
+    for name, value in replacements:
+      setattr(handler, name, value)
+    try:
+      clone = copy.deepcopy(self)
+    finally:
+      for name, value in originals:
+        setattr(handler, name, value)
+    if not stop_callbacks:
+      clone._callback_dict[self.STOP_CALLBACK] = []
+    return clone
   
   def stop(self, finish_time):
     """
@@ -222,7 +313,7 @@ class SimulationEngine:
       # Set finish time
       self._finish_time = finish_time
       # Schedule finishing event
-      self._event_list += [Event(self.END_EVENT, self._finish_time)]
+      self._insert(Event(self.END_EVENT, self._finish_time))
       self._finish_event_exists = True
   
   def schedule(self, event):
@@ -232,13 +323,16 @@ class SimulationEngine:
     Arguments:
     event -- Event to be scheduled
     """
+    # Check whether the event happens in the past; if so, throw an error
+    if event.time < self.simulation_time:
+      raise Exception("Cannot schedule event in the past!")
+    # Delay the event behind the events of the current batch
+    if event.time < self._handled_time:
+      event = Event(event.identifier, self._handled_time, **event.kwargs)
     # Discard new event if happens after the finishing event
     if event.time < self._finish_time:
       # Add the event to the event list
-      self._event_list += [event]
-      # Sort the list in a LIFO style
-      self._event_list.sort(key=lambda x: x.time)
-      self._event_list.reverse()
+      self._insert(event)
   
   def register_callback(self, func, ttype):
     """
@@ -250,6 +344,36 @@ class SimulationEngine:
     """
     self._callback_dict[ttype] += [func]
   
+  def _insert(self, event):
+    """
+    Inserts event into the event list, keeping it sorted in a LIFO style;
+    the event is placed behind already scheduled events with equal time
+    
+    Arguments:
+    event -- Event to be inserted
+    """
+    # Binary search for the first event not later than the new one
+    lo, hi = 0, len(self._event_list)
+    while lo < hi:
+      mid = (lo + hi) // 2
+      if self._event_list[mid].time > event.time:
+        lo = mid + 1
+      else:
+        hi = mid
+    self._event_list.insert(lo, event)
+  
+  def _pop_batch(self):
+    """
+    Removes and returns imminent event together with all events
+    occurring within batch_window of it, in the order of handling
+    """
+    imminent = self._event_list.pop()
+    batch = [imminent]
+    horizon = imminent.time + self.batch_window
+    while len(self._event_list) > 0 and self._event_list[-1].time <= horizon:
+      batch += [self._event_list.pop()]
+    return batch
+  
   def _notify_start(self):
     """
     Notifies of start of the simulation
@@ -271,3 +395,12 @@ class SimulationEngine:
     """
     for func in self._callback_dict[self.EVENT_CALLBACK]: func(event)
   
+  def _notify_batch(self, batch):
+    """
+    Notifies of a batch of imminent events
+    
+    Arguments:
+    batch -- List of imminent events
+    """
+    for func in self._callback_dict[self.BATCH_CALLBACK]: func(batch)
+  
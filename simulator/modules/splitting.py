@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import numpy as np
+
+
+class FixedEffortSplitting:
+  """
+  Estimates rare event probabilities using fixed-effort
+  multilevel splitting
+  """
+  def __init__(self, importance, thresholds, effort, is_failure, target=None):
+    """
+    Constructs FixedEffortSplitting instance
+
+    A trajectory of stage k is successful if importance reaches
+    thresholds[k] before is_failure returns True (or the simulation
+    ends). If target is given, an extra stage is run from the states
+    reaching the last threshold, and a trajectory is successful if
+    target returns True before failure. The estimate is unbiased for
+    the probability of the rare event as long as the event cannot
+    occur without crossing all thresholds.
+
+    Arguments:
+    importance -- Function of SimulationEngine returning importance value
+    thresholds -- Increasing list of importance thresholds
+    effort -- Number of trajectories simulated in each stage
+    is_failure -- Function of SimulationEngine; True ends trajectory unsuccessfully
+    target -- Optional function of SimulationEngine; True marks the rare event
+    """
+    self.importance = importance
+    self.thresholds = thresholds
+    self.effort = effort
+    self.is_failure = is_failure
+    self.target = target
+    # Initialize list of conditional probabilities of each stage
+    self.stage_probabilities = []
+    # Initialize list of mean counts of each stage (see expected_count)
+    self.stage_counts = []
+
+  @property
+  def estimate(self):
+    """
+    Returns estimated probability of the rare event
+    """
+    if not self.stage_probabilities:
+      return 0
+    return float(np.prod(self.stage_probabilities))
+
+  def run(self, simulation_engine, seed):
+    """
+    Runs splitting from the current state of the (started) engine
+    and returns estimated probability of the rare event
+
+    Each trajectory is a clone of the engine with its own
+    np.random.RandomState seeded from the master seed. Events
+    already scheduled at the time of cloning are shared by the clones.
+    Clones do not notify of the stop of the simulation, so handlers
+    do not save statistics of the trajectories. The cost of cloning
+    depends on the handler state; see EventHandler.clone_replacements.
+
+    Arguments:
+    simulation_engine -- Paused SimulationEngine instance
+    seed -- Seed for the master PRNG
+    """
+    master_prng = np.random.RandomState(seed)
+    # Build success conditions of each stage
+    conditions = [self._threshold_condition(t) for t in self.thresholds]
+    if self.target is not None:
+      conditions += [self.target]
+    self.stage_probabilities = []
+    states = [simulation_engine]
+    for condition in conditions:
+      successes = []
+      for n in range(self.effort):
+        # Distribute effort evenly among the entrance states
+        trajectory = states[n % len(states)].clone(stop_callbacks=False)
+        trajectory.prng = np.random.RandomState(master_prng.randint(2**31))
+        if self._simulate(trajectory, condition):
+          successes += [trajectory]
+      self.stage_probabilities += [len(successes) / self.effort]
+      # Stop if no trajectory reached the next level
+      if not successes:
+        break
+      states = successes
+    return self.estimate
+
+  def expected_count(self, simulation_engine, seed, counter):
+    """
+    Runs splitting from the current state of the (started) engine
+    and returns estimated expected increase of the counter until
+    failure (target is not used)
+
+    Stage k runs from the states reaching thresholds[k-1] (or from the
+    initial state) until thresholds[k] or failure; the last stage runs
+    until failure. Counts of each stage are weighted by the estimated
+    probability of reaching it, so counted events need not cross
+    all thresholds.
+
+    Arguments:
+    simulation_engine -- Paused SimulationEngine instance
+    seed -- Seed for the master PRNG
+    counter -- Function of SimulationEngine returning cumulative count
+    """
+    master_prng = np.random.RandomState(seed)
+    self.stage_probabilities = []
+    self.stage_counts = []
+    states = [simulation_engine]
+    # Estimated probability of reaching the current stage
+    weight = 1
+    estimate = 0
+    for threshold in self.thresholds + [None]:
+      if threshold is None:
+        condition = lambda engine: False
+      else:
+        condition = self._threshold_condition(threshold)
+      successes = []
+      count = 0
+      for n in range(self.effort):
+        trajectory = states[n % len(states)].clone(stop_callbacks=False)
+        trajectory.prng = np.random.RandomState(master_prng.randint(2**31))
+        initial_count = counter(trajectory)
+        if self._simulate(trajectory, condition):
+          successes += [trajectory]
+        count += counter(trajectory) - initial_count
+      self.stage_counts += [count / self.effort]
+      estimate += weight * count / self.effort
+      if threshold is None or not successes:
+        break
+      self.stage_probabilities += [len(successes) / self.effort]
+      weight *= len(successes) / self.effort
+      states = successes
+    return estimate
+
+  def _threshold_condition(self, threshold):
+    """
+    Returns function checking whether importance reached the threshold
+
+    Arguments:
+    threshold -- Importance threshold
+    """
+    return lambda engine: self.importance(engine) >= threshold
+
+  def _simulate(self, trajectory, condition):
+    """
+    Simulates trajectory until success or failure; returns True
+    on success
+
+    Arguments:
+    trajectory -- SimulationEngine instance
+    condition -- Success condition
+    """
+    trajectory.resume(lambda: condition(trajectory) or self.is_failure(trajectory))
+    return condition(trajectory)
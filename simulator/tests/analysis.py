@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import numpy as np
+from simulator.modules.analysis import *
+import unittest
+
+
+class WelchAverageTests(unittest.TestCase):
+  def welch_average_loop(self, init_means, window_size):
+    # Original loop of analyze-example.py
+    means = []
+    for i in range(len(init_means) - window_size):
+      if i < window_size:
+        means += [sum([init_means[i+s] for s in range(-i, i+1)]) / (2*(i+1) - 1)]
+      else:
+        means += [sum([init_means[i+s] for s in range(-window_size, window_size+1)]) / (2*window_size + 1)]
+    return means
+
+  def test_no_window(self):
+    self.assertEqual(list(welch_average([1.0, 2.0], 0)), [1.0, 2.0])
+
+  def test_window(self):
+    init_means = list(np.random.RandomState(0).uniform(size=20))
+    for window_size in (1, 3, 5):
+      np.testing.assert_allclose(welch_average(init_means, window_size),
+                                 self.welch_average_loop(init_means, window_size))
+
+
+
+class ConfidenceIntervalTests(unittest.TestCase):
+  def test_confidence_interval(self):
+    mean, sd, se, ci = confidence_interval([1.0, 2.0, 3.0, 4.0], 0.95)
+    self.assertAlmostEqual(mean, 2.5)
+    self.assertAlmostEqual(sd, np.sqrt(5/3))
+    self.assertAlmostEqual(se, np.sqrt(5/3) / 2)
+    # t quantile for 3 degrees of freedom
+    self.assertAlmostEqual(ci, se * 3.182446305, places=6)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import numpy as np
+from simulator.modules.arena import *
+import simulator.modules.mm1 as mm1
+import unittest
+
+
+def constant(seed, length):
+  return np.full(length, float(seed))
+
+
+class ResultArenaTests(unittest.TestCase):
+  def setUp(self):
+    self.arena = ResultArena(3, 4)
+
+  def tearDown(self):
+    self.arena.close()
+    self.arena.unlink()
+
+  def test_init(self):
+    self.assertEqual(list(self.arena.counts), [0, 0, 0])
+    self.assertEqual(self.arena.data.shape, (3, 4))
+
+  def test_write(self):
+    self.arena.write(1, [1.0, 2.0])
+    with self.assertWarns(UserWarning):
+      self.arena.write(2, np.arange(6))
+    self.assertEqual(list(self.arena.replication(0)), [])
+    self.assertEqual(list(self.arena.replication(1)), [1.0, 2.0])
+    self.assertEqual(list(self.arena.replication(2)), [0.0, 1.0, 2.0, 3.0])
+
+  def test_attach(self):
+    other = ResultArena(3, 4, self.arena.name)
+    other.write(0, [5.0])
+    other.close()
+    self.assertEqual(list(self.arena.replication(0)), [5.0])
+
+  def test_write_beyond_capacity(self):
+    with self.assertWarnsRegex(UserWarning, 'Replication 1 truncated from 6 to 4 values'):
+      self.arena.write(1, np.arange(6))
+    self.assertEqual(self.arena.counts[1], 4)
+    self.assertEqual(self.arena.lengths[1], 6)
+    self.assertEqual(list(self.arena.truncated), [False, True, False])
+
+  def test_means_of_truncated_replication(self):
+    with self.assertWarns(UserWarning):
+      self.arena.write(0, np.arange(6))
+    with self.assertRaisesRegex(ValueError, 'exceeded capacity'):
+      self.arena.means()
+
+  def test_means_warmup_beyond_count(self):
+    for n in range(3):
+      self.arena.write(n, [1.0, 2.0])
+    with self.assertRaisesRegex(ValueError, r'Replications \[0, 1, 2\] have no values after warm-up 2'):
+      self.arena.means(warmup=2)
+
+  def test_means(self):
+    self.arena.write(0, [1.0, 2.0, 3.0])
+    self.arena.write(1, [3.0, 4.0, 5.0, 6.0])
+    self.arena.write(2, [5.0, 6.0])
+    self.assertEqual(list(self.arena.means()), [2.0, 4.5, 5.5])
+    self.assertEqual(list(self.arena.means(warmup=1)), [2.5, 5.0, 6.0])
+    self.assertEqual(list(self.arena.transient_means()), [3.0, 4.0])
+
+  def test_run_replications(self):
+    run_replications(self.arena, constant, {'length': 2}, [7, 8, 9], processes=2)
+    self.assertEqual(self.arena.data[:, :2].tolist(), [[7.0, 7.0], [8.0, 8.0], [9.0, 9.0]])
+    self.assertEqual(list(self.arena.counts), [2, 2, 2])
+
+  def test_run_mm1_replications(self):
+    params = {'sim_duration': 100, 'interarrival_rate': 1, 'service_rate': 2}
+    arena = ResultArena(2, 1000)
+    try:
+      run_replications(arena, mm1.run_replication, params, [0, 1], processes=2)
+      self.assertEqual(list(arena.replication(1)), list(mm1.run_replication(1, **params)))
+      self.assertFalse(arena.truncated.any())
+    finally:
+      arena.close()
+      arena.unlink()
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import socket
+import threading
+from simulator.modules.dist import *
+import unittest
+
+
+def square(seed, offset=0):
+  return seed*seed + offset
+
+def fail(seed):
+  raise ValueError("Failed for seed {}".format(seed))
+
+
+class CoordinatorTests(unittest.TestCase):
+  def setUp(self):
+    self.coordinator = Coordinator(pipeline_depth=3)
+    self.host, self.port = self.coordinator.address
+
+  def tearDown(self):
+    self.coordinator.close()
+
+  def start_worker(self):
+    thread = threading.Thread(target=Worker(self.host, self.port).run)
+    thread.start()
+    return thread
+
+  def test_run(self):
+    workers = [self.start_worker() for _ in range(2)]
+    results = self.coordinator.run(square, {'offset': 1}, list(range(10)))
+    for worker in workers:
+      worker.join()
+    self.assertEqual(results, [s*s + 1 for s in range(10)])
+
+  def test_reissue_on_worker_failure(self):
+    def failing_worker():
+      # Receive a task and die without answering
+      with socket.create_connection((self.host, self.port)) as sock:
+        receive_message(sock)
+      self.worker = self.start_worker()
+    thread = threading.Thread(target=failing_worker)
+    thread.start()
+    results = self.coordinator.run(square, {}, list(range(5)))
+    thread.join()
+    self.worker.join()
+    self.assertEqual(results, [s*s for s in range(5)])
+
+
+  def test_factory_raises(self):
+    worker = self.start_worker()
+    with self.assertRaisesRegex(TaskError, 'ValueError: Failed for seed'):
+      self.coordinator.run(fail, {}, [1, 2])
+    worker.join()
+
+  def test_max_reissues(self):
+    self.coordinator.max_reissues = 1
+    def failing_workers():
+      # Two workers receive the same task and die without answering
+      for _ in range(2):
+        with socket.create_connection((self.host, self.port)) as sock:
+          receive_message(sock)
+    thread = threading.Thread(target=failing_workers)
+    thread.start()
+    with self.assertRaisesRegex(TaskError, 'Task 0 reissued more than 1 times'):
+      self.coordinator.run(square, {}, [1])
+    thread.join()
+
+  def test_timeout(self):
+    self.coordinator.timeout = 0.1
+    with self.assertRaisesRegex(TaskError, 'No worker activity'):
+      self.coordinator.run(square, {}, [1])
+
+
+  def test_stalled_peer(self):
+    self.coordinator.timeout = 0.5
+    done = threading.Event()
+    def stalled_peer():
+      # Send only a message header and keep the connection open
+      with socket.create_connection((self.host, self.port)) as sock:
+        sock.sendall(b"\x00\x00\x01\x00")
+        self.worker = self.start_worker()
+        done.wait(10)
+    thread = threading.Thread(target=stalled_peer)
+    thread.start()
+    results = self.coordinator.run(square, {}, [1, 2, 3])
+    done.set()
+    thread.join()
+    self.worker.join()
+    self.assertEqual(results, [1, 4, 9])
+
+  def test_malformed_message(self):
+    def malformed_peer():
+      with socket.create_connection((self.host, self.port)) as sock:
+        sock.sendall(b"\x00\x00\x00\x03abc")
+        self.worker = self.start_worker()
+    thread = threading.Thread(target=malformed_peer)
+    thread.start()
+    results = self.coordinator.run(square, {}, [2])
+    thread.join()
+    self.worker.join()
+    self.assertEqual(results, [4])
+
+  def test_authenticated_worker_without_authkey(self):
+    self.coordinator.timeout = 0.5
+    errors = []
+    def worker():
+      try:
+        Worker(self.host, self.port, b"secret").run()
+      except (AuthenticationError, OSError) as e:
+        errors.append(e)
+    thread = threading.Thread(target=worker)
+    thread.start()
+    with self.assertRaises(TaskError):
+      self.coordinator.run(square, {}, [1])
+    thread.join()
+    self.assertEqual(len(errors), 1)
+
+
+class AuthenticatedCoordinatorTests(unittest.TestCase):
+  def setUp(self):
+    self.coordinator = Coordinator(authkey=b"secret")
+    self.host, self.port = self.coordinator.address
+
+  def tearDown(self):
+    self.coordinator.close()
+
+  def test_run(self):
+    worker = threading.Thread(target=Worker(self.host, self.port, b"secret").run)
+    worker.start()
+    self.assertEqual(self.coordinator.run(square, {}, [1, 2]), [1, 4])
+    worker.join()
+
+  def test_reject_wrong_key(self):
+    def workers():
+      with self.assertRaises((AuthenticationError, ConnectionError)):
+        Worker(self.host, self.port, b"wrong").run()
+      Worker(self.host, self.port, b"secret").run()
+    thread = threading.Thread(target=workers)
+    thread.start()
+    self.assertEqual(self.coordinator.run(square, {}, [3]), [9])
+    thread.join()
+
+  def test_stalled_handshake(self):
+    self.coordinator.timeout = 0.5
+    done = threading.Event()
+    def stalled_peer():
+      # Connect without answering the challenge
+      with socket.create_connection((self.host, self.port)):
+        Worker(self.host, self.port, b"secret").run()
+        done.wait(10)
+    thread = threading.Thread(target=stalled_peer)
+    thread.start()
+    self.assertEqual(self.coordinator.run(square, {}, [5]), [25])
+    done.set()
+    thread.join()
+
+  def test_non_loopback_requires_authkey(self):
+    with self.assertRaisesRegex(ValueError, 'authkey is required'):
+      Coordinator(host="0.0.0.0")
+
+
+class MessageTests(unittest.TestCase):
+  def test_send_receive(self):
+    a, b = socket.socketpair()
+    with a, b:
+      send_message(a, (1, square, {'offset': 2}, 3))
+      task_id, factory, params, seed = receive_message(b)
+      self.assertEqual(task_id, 1)
+      self.assertEqual(factory(seed, **params), 11)
+
+  def test_receive_on_closed_connection(self):
+    a, b = socket.socketpair()
+    a.close()
+    with b:
+      with self.assertRaises(ConnectionError):
+        receive_message(b)
+
+
+if __name__ == '__main__':
+  unittest.main()
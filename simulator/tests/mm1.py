@@ -2,7 +2,7 @@
 # encoding: utf-8
 
 import numpy as np
-from simulator.modules.mm1 import MM1EventHandler
+from simulator.modules.mm1 import *
 from simulator.modules.sim import SimulationEngine, Event
 import unittest
 
@@ -21,6 +21,10 @@ class MM1EventHandlerTests(unittest.TestCase):
     self.assertEqual(eh._arrivals, [])
     self.assertEqual(eh._departures, [])
     self.assertFalse(eh._is_processing)
+    self.assertEqual(eh._queue_length_area, 0)
+    self.assertEqual(eh._busy_time, 0)
+    self.assertEqual(eh.max_queue_length, 0)
+    self.assertEqual(eh.snapshots, [])
 
   def test_properties(self):
     self.assertEqual(self.eh.interarrival_rate, 0.05)
@@ -71,6 +75,119 @@ class MM1EventHandlerTests(unittest.TestCase):
     self.eh.handle_event(Event(MM1EventHandler.DEPARTURE_EVENT, 1.0))
     self.assertTrue(self.eh._is_processing)
 
+  def test_time_averages(self):
+    self.eh.handle_event(Event(MM1EventHandler.ARRIVAL_EVENT, 1.0))
+    self.eh.handle_event(Event(MM1EventHandler.ARRIVAL_EVENT, 2.0))
+    self.eh.handle_event(Event(MM1EventHandler.DEPARTURE_EVENT, 3.0))
+    self.eh.handle_event(Event(MM1EventHandler.DEPARTURE_EVENT, 5.0))
+    self.eh.handle_event(Event(SimulationEngine.END_EVENT, 8.0))
+    # Queue length: 0 on [0,1), 1 on [1,2), 2 on [2,3), 1 on [3,5), 0 on [5,8)
+    self.assertAlmostEqual(self.eh._queue_length_area, 5.0)
+    self.assertAlmostEqual(self.eh.mean_queue_length, 5.0 / 8.0)
+    self.assertAlmostEqual(self.eh.utilisation, 4.0 / 8.0)
+    self.assertEqual(self.eh.max_queue_length, 2)
+
+  def test_time_averages_without_recording_delays(self):
+    se = SimulationEngine()
+    se.prng = np.random.RandomState(0)
+    eh = MM1EventHandler(se)
+    se.event_handler = eh
+    eh.interarrival_rate = 1
+    eh.service_rate = 2
+    eh.record_delays = False
+    eh.save_delays = False
+    se.stop(20000)
+    se.start()
+    self.assertEqual(eh._arrivals, [])
+    self.assertEqual(eh._departures, [])
+    self.assertAlmostEqual(eh.mean_queue_length, 1.0, delta=0.1)
+    self.assertAlmostEqual(eh.utilisation, 0.5, delta=0.02)
+    self.assertGreater(eh.max_queue_length, 0)
+
+  def test_batch_window(self):
+    se = SimulationEngine()
+    se.prng = np.random.RandomState(1)
+    eh = MM1EventHandler(se)
+    se.event_handler = eh
+    eh.interarrival_rate = 1
+    eh.service_rate = 1.2
+    eh.save_delays = False
+    se.batch_window = 0.5
+    times = []
+    handle_event = eh.handle_event
+    eh.handle_event = lambda event: times.append(event.time) or handle_event(event)
+    se.stop(2000)
+    se.start()
+    self.assertEqual(times, sorted(times))
+    self.assertTrue(all(eh.delays >= 0))
+    self.assertGreaterEqual(eh._queue_length_area, 0)
+
+  def test_snapshots(self):
+    self.eh.snapshot_interval = 2.0
+    self.eh._next_snapshot_time = 2.0
+    self.eh.handle_event(Event(MM1EventHandler.ARRIVAL_EVENT, 1.0))
+    self.eh.handle_event(Event(MM1EventHandler.DEPARTURE_EVENT, 5.0))
+    self.assertEqual(self.eh.snapshots, [(2.0, 1, 1.0, 1.0), (4.0, 1, 3.0, 3.0)])
+
+  def test_snapshots_ring_buffer(self):
+    self.eh.snapshot_interval = 1.0
+    self.eh._next_snapshot_time = 1.0
+    event_time = MM1EventHandler.SNAPSHOT_BUFFER_SIZE + 10.5
+    self.eh.handle_event(Event(SimulationEngine.END_EVENT, event_time))
+    snapshots = self.eh.snapshots
+    self.assertEqual(len(snapshots), MM1EventHandler.SNAPSHOT_BUFFER_SIZE)
+    self.assertEqual(snapshots[-1][0], MM1EventHandler.SNAPSHOT_BUFFER_SIZE + 10.0)
+
+  def test_delays(self):
+    self.eh._arrivals = [1.0, 2.0, 4.0]
+    self.eh._departures = [3.0, 5.0]
+    self.assertEqual(list(self.eh.delays), [2.0, 3.0])
+
+  def test_clone_drops_history(self):
+    self.eh._arrivals = [1.0, 2.0, 4.0]
+    self.eh._departures = [3.0]
+    self.eh._simulation_engine.event_handler = self.eh
+    clone = self.eh._simulation_engine.clone().event_handler
+    self.assertEqual(clone._arrivals, [2.0, 4.0])
+    self.assertEqual(clone._departures, [])
+    self.assertEqual(self.eh._arrivals, [1.0, 2.0, 4.0])
+
+  def test_last_delay(self):
+    self.assertIsNone(self.eh.last_delay)
+    self.eh._arrivals = [1.0, 2.0, 4.0]
+    self.eh._departures = [3.0, 5.0]
+    self.assertEqual(self.eh.last_delay, 3.0)
+
+  def test_delay_exceedances(self):
+    self.eh.delay_threshold = 2.2
+    self.eh._is_processing = True
+    for event_time in (1.0, 2.0, 3.0):
+      self.eh.handle_event(Event(MM1EventHandler.ARRIVAL_EVENT, event_time))
+    for event_time in (3.5, 4.0, 6.0):
+      self.eh.handle_event(Event(MM1EventHandler.DEPARTURE_EVENT, event_time))
+    self.assertEqual(self.eh.queue_length, 0)
+    self.assertEqual(self.eh.delay_exceedances, 2)
+
+  def test_last_delay_after_clone(self):
+    self.eh._arrivals = [1.0, 2.0, 4.0]
+    self.eh._departures = [3.0]
+    self.eh._queue_length = 2
+    self.eh._simulation_engine.event_handler = self.eh
+    clone = self.eh._simulation_engine.clone().event_handler
+    clone.handle_event(Event(MM1EventHandler.DEPARTURE_EVENT, 6.0))
+    self.assertEqual(clone.last_delay, 4.0)
+
+  def test_delay_tail_splitting(self):
+    estimate = delay_tail_splitting(3, 1, 2, list(range(1, 8)), 200, 0)
+    expected = delay_tail_probability(3, 1, 2)
+    self.assertAlmostEqual(estimate, expected, delta=0.4*expected)
+
+  def test_run_replication(self):
+    delays = run_replication(0, 1000, 0.05, 0.1)
+    self.assertGreater(len(delays), 0)
+    self.assertTrue(all(delays > 0))
+    self.assertEqual(list(delays), list(run_replication(0, 1000, 0.05, 0.1)))
+
 
 if __name__ == '__main__':
   unittest.main()
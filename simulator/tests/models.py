@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+from simulator.modules.models import ModelRegistry
+import simulator.modules.models as models
+import simulator.modules.mm1 as mm1
+import unittest
+
+
+def replicate(seed, rate):
+  return seed * rate
+
+
+class ModelRegistryTests(unittest.TestCase):
+  def setUp(self):
+    self.calls = 0
+    self.registry = ModelRegistry(cache_size=2)
+
+  def estimator(self, rate):
+    self.calls += 1
+    return {'mean': rate} if rate > 0 else None
+
+  def test_unregistered(self):
+    self.assertFalse(self.registry.has_estimator(replicate))
+    self.assertIsNone(self.registry.estimate(replicate, {'rate': 1}))
+
+  def test_estimate(self):
+    self.registry.register(replicate, self.estimator)
+    self.assertTrue(self.registry.has_estimator(replicate))
+    self.assertEqual(self.registry.estimate(replicate, {'rate': 2}), {'mean': 2})
+    self.assertIsNone(self.registry.estimate(replicate, {'rate': 0}))
+
+  def test_memoization(self):
+    self.registry.register(replicate, self.estimator)
+    for _ in range(3):
+      self.registry.estimate(replicate, {'rate': 2})
+    self.assertEqual(self.calls, 1)
+    self.assertEqual(self.registry.cache_info().hits, 2)
+    # Least recently used estimate is evicted
+    self.registry.estimate(replicate, {'rate': 3})
+    self.registry.estimate(replicate, {'rate': 4})
+    self.registry.estimate(replicate, {'rate': 2})
+    self.assertEqual(self.calls, 4)
+
+  def test_estimate_returns_copy(self):
+    self.registry.register(replicate, self.estimator)
+    self.registry.estimate(replicate, {'rate': 2})['mean'] = 0
+    self.assertEqual(self.registry.estimate(replicate, {'rate': 2}), {'mean': 2})
+
+  def test_unused_parameters_not_in_cache_key(self):
+    self.registry.register(replicate, self.estimator)
+    for duration in (10, 20, 30):
+      self.assertEqual(self.registry.estimate(replicate, {'rate': 2, 'duration': duration}), {'mean': 2})
+    self.assertEqual(self.calls, 1)
+    self.assertEqual(self.registry.cache_info().hits, 2)
+
+  def test_estimator_with_kwargs(self):
+    self.registry.register(replicate, lambda **params: params)
+    self.assertEqual(self.registry.estimate(replicate, {'rate': 2, 'duration': 1}), {'rate': 2, 'duration': 1})
+
+  def test_mm1_registered(self):
+    params = {'sim_duration': 1000, 'interarrival_rate': 1, 'service_rate': 4}
+    estimates = models.registry.estimate(mm1.run_replication, params)
+    self.assertAlmostEqual(estimates['mean_delay'], 1/3)
+    self.assertAlmostEqual(estimates['mean_queue_length'], 1/3)
+    self.assertAlmostEqual(estimates['utilisation'], 0.25)
+    self.assertAlmostEqual(estimates['relaxation_time'], 1)
+    params['interarrival_rate'] = 4
+    self.assertIsNone(models.registry.estimate(mm1.run_replication, params))
+
+  def test_mm1_simulation_matches_estimates(self):
+    params = {'sim_duration': 20000, 'interarrival_rate': 1, 'service_rate': 2}
+    delays = mm1.run_replication(0, **params)
+    estimates = models.registry.estimate(mm1.run_replication, params)
+    self.assertAlmostEqual(delays.mean(), estimates['mean_delay'], delta=0.1)
+    self.assertAlmostEqual((delays > 2).mean(), mm1.delay_tail_probability(2, 1, 2), delta=0.03)
+
+
+if __name__ == '__main__':
+  unittest.main()
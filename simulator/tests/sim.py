@@ -20,6 +20,28 @@ class TestEventHandler(EventHandler):
     self.events.append(event)
 
 
+class TestBatchEventHandler(TestEventHandler):
+  def __init__(self, simulation_engine):
+    super().__init__(simulation_engine)
+    self.batches = []
+
+  def handle_events(self, batch):
+    self.batches.append([(e.identifier, e.time) for e in batch])
+
+
+class TestSchedulingBatchEventHandler(TestBatchEventHandler):
+  def __init__(self, simulation_engine):
+    super().__init__(simulation_engine)
+    self.times = []
+
+  def handle_events(self, batch):
+    super().handle_events(batch)
+    self.times.append(self._simulation_engine.simulation_time)
+    for e in batch:
+      if e.identifier == "A":
+        self._simulation_engine.schedule(Event("F", e.time + 0.1))
+
+
 class SimulationEngineTests(unittest.TestCase):
   def setUp(self):
     self.se = SimulationEngine()
@@ -48,6 +70,102 @@ class SimulationEngineTests(unittest.TestCase):
     self.assertEqual(self.se.event_handler.events[0].time, 1)
     self.assertEqual(self.se.event_handler.events[1].identifier, "End")
     self.assertEqual(self.se.event_handler.events[1].time, 2)
+
+  def test_equal_times_in_scheduling_order(self):
+    self.se.stop(5)
+    for identifier, time in [("A", 2), ("B", 1), ("C", 2), ("D", 1), ("E", 2)]:
+      self.se.schedule(Event(identifier, time))
+    self.se.start()
+    self.assertEqual([e.identifier for e in self.test_eh.events], ["B", "D", "A", "C", "E", "End"])
+
+  def test_batch_disabled_by_default(self):
+    self.assertIsNone(self.se.batch_window)
+
+  def test_default_handle_events(self):
+    self.se.batch_window = 0
+    self.se.stop(2)
+    self.se.schedule(Event("A", 1))
+    self.se.schedule(Event("B", 1))
+    self.se.start()
+    self.assertEqual([e.identifier for e in self.test_eh.events], ["A", "B", "End"])
+
+  def test_batch_equal_times(self):
+    se = SimulationEngine()
+    eh = TestBatchEventHandler(se)
+    se.event_handler = eh
+    se.batch_window = 0
+    se.stop(3)
+    for identifier, time in [("A", 1), ("B", 2), ("C", 1), ("D", 2.5)]:
+      se.schedule(Event(identifier, time))
+    se.start()
+    self.assertEqual(eh.batches, [[("A", 1), ("C", 1)], [("B", 2)], [("D", 2.5)], [("End", 3)]])
+    self.assertEqual(eh.events, [])
+
+  def test_batch_window(self):
+    se = SimulationEngine()
+    eh = TestBatchEventHandler(se)
+    se.event_handler = eh
+    se.batch_window = 0.5
+    se.stop(3)
+    for identifier, time in [("A", 1), ("B", 2), ("C", 1.5), ("D", 2.5), ("E", 2.6)]:
+      se.schedule(Event(identifier, time))
+    times = []
+    se.start(lambda: times.append(se.simulation_time))
+    self.assertEqual(eh.batches, [[("A", 1), ("C", 1.5)], [("B", 2), ("D", 2.5)], [("E", 2.6), ("End", 3)]])
+    # Clock is advanced to the imminent event of each batch
+    self.assertEqual(times, [0, 1, 2])
+
+  def test_schedule_within_batch(self):
+    se = SimulationEngine()
+    eh = TestSchedulingBatchEventHandler(se)
+    se.event_handler = eh
+    se.batch_window = 0.5
+    se.stop(3)
+    se.schedule(Event("A", 1))
+    se.schedule(Event("C", 1.5))
+    se.start()
+    # F is delayed behind C, so handled times never go backwards
+    self.assertEqual(eh.batches, [[("A", 1), ("C", 1.5)], [("F", 1.5)], [("End", 3)]])
+    self.assertEqual(eh.times, [1, 1.5, 3])
+
+  def test_schedule_in_the_past(self):
+    self.se.simulation_time = 2
+    with self.assertRaisesRegex(Exception, 'Cannot schedule event in the past!'):
+      self.se.schedule(Event("Dummy", 1))
+
+  def test_pause_and_resume(self):
+    self.se.stop(3)
+    self.se.schedule(Event("Dummy", 1))
+    self.assertTrue(self.se.start(lambda: len(self.test_eh.events) == 1))
+    self.assertEqual(self.se.simulation_time, 1)
+    self.assertFalse(self.test_eh.stop_callback_received)
+    self.assertFalse(self.se.resume())
+    self.assertEqual(self.se.simulation_time, 3)
+    self.assertTrue(self.test_eh.stop_callback_received)
+
+  def test_clone(self):
+    self.se.stop(3)
+    self.se.schedule(Event("Dummy", 1))
+    self.se.start(lambda: True)
+    clone = self.se.clone()
+    clone.resume()
+    self.assertEqual(len(clone.event_handler.events), 2)
+    self.assertEqual(self.test_eh.events, [])
+    self.assertEqual(self.se.simulation_time, 0)
+
+  def test_clone_without_stop_callbacks(self):
+    self.se.stop(3)
+    self.se.start(lambda: True)
+    clone = self.se.clone(stop_callbacks=False)
+    clone.resume()
+    self.assertFalse(clone.event_handler.stop_callback_received)
+
+  def test_clone_replacements(self):
+    self.test_eh.clone_replacements = lambda: [('events', ["Replaced"])]
+    self.test_eh.events = ["Original"]
+    clone = self.se.clone()
+    self.assertEqual(clone.event_handler.events, ["Replaced"])
+    self.assertEqual(self.test_eh.events, ["Original"])
   
 
 class EventTests(unittest.TestCase):
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import numpy as np
+from simulator.modules.mm1 import MM1EventHandler, delay_exceeds
+from simulator.modules.sim import SimulationEngine
+from simulator.modules.splitting import FixedEffortSplitting
+import unittest
+
+
+def queue_length(engine):
+  return engine.event_handler.queue_length
+
+def busy_cycle_ended(engine):
+  return queue_length(engine) == 0 and engine.simulation_time > 0
+
+
+class FixedEffortSplittingTests(unittest.TestCase):
+  def setUp(self):
+    self.se = SimulationEngine()
+    self.se.prng = np.random.RandomState(0)
+    eh = MM1EventHandler(self.se)
+    self.se.event_handler = eh
+    eh.interarrival_rate = 1
+    eh.service_rate = 2
+    eh.save_delays = False
+    self.se.stop(1e9)
+    # Pause right after the start of the simulation
+    self.se.start(lambda: True)
+
+  def test_estimate(self):
+    # Probability of reaching queue length 5 in a busy cycle
+    # (gambler's ruin with up-step probability 1/3)
+    splitting = FixedEffortSplitting(queue_length, list(range(1, 6)), 200, busy_cycle_ended)
+    estimate = splitting.run(self.se, 0)
+    self.assertEqual(len(splitting.stage_probabilities), 5)
+    self.assertEqual(splitting.stage_probabilities[0], 1.0)
+    self.assertAlmostEqual(estimate, 1/31, delta=0.01)
+
+  def test_target(self):
+    splitting = FixedEffortSplitting(queue_length, [1], 50, busy_cycle_ended,
+                                     target=lambda e: queue_length(e) >= 2)
+    splitting.run(self.se, 0)
+    self.assertEqual(len(splitting.stage_probabilities), 2)
+    self.assertAlmostEqual(splitting.estimate, 1/3, delta=0.15)
+
+  def test_delay_target(self):
+    splitting = FixedEffortSplitting(queue_length, [1], 50, busy_cycle_ended, target=delay_exceeds(0))
+    splitting.run(self.se, 0)
+    self.assertEqual(splitting.stage_probabilities, [1.0, 1.0])
+
+  def test_expected_count(self):
+    self.se.event_handler.delay_threshold = 1
+    exceedances = lambda e: e.event_handler.delay_exceedances
+    splitting = FixedEffortSplitting(queue_length, [1, 2, 3], 100, busy_cycle_ended)
+    estimate = splitting.expected_count(self.se, 0, exceedances)
+    self.assertEqual(len(splitting.stage_counts), 4)
+    self.assertEqual(len(splitting.stage_probabilities), 3)
+    # Same quantity estimated without splitting
+    plain = FixedEffortSplitting(queue_length, [], 1000, busy_cycle_ended)
+    self.assertAlmostEqual(estimate, plain.expected_count(self.se, 1, exceedances), delta=0.15)
+
+  def test_estimate_unreachable(self):
+    splitting = FixedEffortSplitting(queue_length, [1, 1000], 10, busy_cycle_ended)
+    self.assertEqual(splitting.run(self.se, 0), 0)
+    self.assertEqual(splitting.stage_probabilities, [1.0, 0.0])
+
+  def test_trajectories_do_not_save_statistics(self):
+    se = SimulationEngine()
+    se.prng = np.random.RandomState(0)
+    eh = MM1EventHandler(se)
+    se.event_handler = eh
+    eh.interarrival_rate = 1
+    eh.service_rate = 2
+    # No sim_id and save_delays left on; trajectories run to the end
+    se.stop(5)
+    se.start(lambda: True)
+    splitting = FixedEffortSplitting(queue_length, [1000], 5, lambda e: False)
+    self.assertEqual(splitting.run(se, 0), 0)
+
+  def test_original_engine_untouched(self):
+    splitting = FixedEffortSplitting(queue_length, [1, 2], 10, busy_cycle_ended)
+    splitting.run(self.se, 0)
+    self.assertEqual(self.se.simulation_time, 0)
+    self.assertEqual(queue_length(self.se), 0)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -2,8 +2,13 @@
 # encoding: utf-8
 
 import unittest
+import simulator.tests.analysis as analysis
+import simulator.tests.arena as arena
+import simulator.tests.dist as dist
 import simulator.tests.mm1 as mm1
+import simulator.tests.models as models
 import simulator.tests.sim as sim
+import simulator.tests.splitting as splitting
 
 
 # Run tests
@@ -17,3 +22,26 @@ unittest.TextTestRunner(verbosity=2).run(
 unittest.TextTestRunner(verbosity=2).run(
     unittest.TestLoader().loadTestsFromTestCase(sim.EventTests))
 
+# 4. Coordinator class
+unittest.TextTestRunner(verbosity=2).run(
+    unittest.TestLoader().loadTestsFromTestCase(dist.CoordinatorTests))
+unittest.TextTestRunner(verbosity=2).run(
+    unittest.TestLoader().loadTestsFromTestCase(dist.AuthenticatedCoordinatorTests))
+# 5. Message functions
+unittest.TextTestRunner(verbosity=2).run(
+    unittest.TestLoader().loadTestsFromTestCase(dist.MessageTests))
+# 6. FixedEffortSplitting class
+unittest.TextTestRunner(verbosity=2).run(
+    unittest.TestLoader().loadTestsFromTestCase(splitting.FixedEffortSplittingTests))
+# 7. ModelRegistry class
+unittest.TextTestRunner(verbosity=2).run(
+    unittest.TestLoader().loadTestsFromTestCase(models.ModelRegistryTests))
+# 8. ResultArena class
+unittest.TextTestRunner(verbosity=2).run(
+    unittest.TestLoader().loadTestsFromTestCase(arena.ResultArenaTests))
+# 9. Welch's method
+unittest.TextTestRunner(verbosity=2).run(
+    unittest.TestLoader().loadTestsFromTestCase(analysis.WelchAverageTests))
+# 10. Confidence intervals
+unittest.TextTestRunner(verbosity=2).run(
+    unittest.TestLoader().loadTestsFromTestCase(analysis.ConfidenceIntervalTests))